@@ -0,0 +1,65 @@
+'''Measures GET /products/autocomplete against a sorted name index of the requested size (3,000,000 names by
+default, generated in memory rather than read from the database, since the route never queries it). Prefixes of
+one to six letters are timed through the route (calling the WSGI app with a request built beforehand, so the
+test client's own work isn't counted) and straight against the index, and the route's p99 has to stay under a
+millisecond. For example
+
+    python bench/autocomplete.py --names 3000000 --requests 10000
+'''
+import argparse
+import random
+import string
+import sys
+import time
+
+from werkzeug.test import EnvironBuilder
+
+from common import load_app
+
+def percentile(times, share):
+    return sorted(times)[min(len(times) - 1, int(len(times) * share))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--names", type=int, default=3000000, help="Number of names in the index.")
+    parser.add_argument("--requests", type=int, default=10000, help="Number of prefixes timed.")
+    parser.add_argument("--target", type=float, default=1.0, help="Largest p99 of the route that passes, in milliseconds.")
+    args = parser.parse_args()
+    app = load_app()
+    app.product_indexes_ready.wait() # Let the startup build finish, so it doesn't replace the index built below
+
+    vocabulary = list({"".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))) for _ in range(20000)})
+    start = time.perf_counter()
+    app.product_prefixes.rebuild((id, f"{' '.join(random.sample(vocabulary, 3)).title()} {id}") for id in range(1, args.names + 1))
+    app.gc.freeze() # As rebuild_product_indexes does after building the indexes from the database
+    print(f"{args.names} names sorted in {time.perf_counter() - start:.1f} s")
+
+    prefixes = [random.choice(vocabulary)[:random.randint(1, 6)] for _ in range(args.requests)]
+    def get(prefix):
+        environ = EnvironBuilder("/products/autocomplete", query_string={"prefix": prefix}).get_environ()
+        start = time.perf_counter()
+        body = b"".join(app.app(environ, lambda status, headers: None))
+        return time.perf_counter() - start, body
+
+    for prefix in prefixes[:100]: # Warm up
+        get(prefix)
+    route_times, index_times, empty = [], [], 0
+    for prefix in prefixes:
+        elapsed, body = get(prefix)
+        route_times.append(elapsed)
+        empty += body.strip() == b"[]"
+        start = time.perf_counter()
+        app.product_prefixes.search(prefix, app.AUTOCOMPLETE_SIZE)
+        index_times.append(time.perf_counter() - start)
+
+    for name, times in [("GET /products/autocomplete", route_times), ("PrefixIndex.search", index_times)]:
+        print(f"{name:<26} p50 {percentile(times, 0.5) * 1000:.3f} ms, p99 {percentile(times, 0.99) * 1000:.3f} ms, "
+              f"max {max(times) * 1000:.3f} ms")
+    p99 = percentile(route_times, 0.99) * 1000
+    if empty:
+        sys.exit(f"{empty} prefix(es) of indexed names returned no suggestions.")
+    if p99 >= args.target:
+        sys.exit(f"The route's p99 is {p99:.3f} ms, over {args.target:g} ms.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+'''Times adding orders with one POST /orders/batch call against posting them one at a time to POST /orders/
+(timed on a sample and scaled up), and checks every order was created. It fails if the batch route adds fewer
+than ten times the orders per second. For example
+
+    python bench/batch_orders.py --orders 10000 --sample 1000 --lines 3
+'''
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from common import load_app, seed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=10000, help="Number of orders sent to the batch route.")
+    parser.add_argument("--sample", type=int, default=1000, help="Number of orders posted one at a time to estimate their rate.")
+    parser.add_argument("--lines", type=int, default=3, help="Number of products on each order.")
+    parser.add_argument("--target", type=float, default=10, help="Smallest speedup of the batch route that passes.")
+    args = parser.parse_args()
+    app = load_app()
+    seed(app, customers=1000, products=1000)
+    client = app.app.test_client()
+    with app.app.app_context():
+        customer_ids = [id for (id,) in app.db.session.query(app.Customer.id)]
+        product_ids = [id for (id,) in app.db.session.query(app.Product.id)]
+        orders_before = app.db.session.query(app.Order).count()
+
+    def order():
+        return {"date": (date.today() - timedelta(days=random.randrange(3650))).isoformat(),
+                "customer_id": random.choice(customer_ids),
+                "products": [{"id": id, "quantity": random.randint(1, 5)} for id in random.sample(product_ids, args.lines)]}
+
+    singles = [order() for _ in range(args.sample)]
+    start = time.perf_counter()
+    single_failures = sum(1 for payload in singles if client.post("/orders/", json=payload).status_code != 201)
+    single_rate = len(singles) / (time.perf_counter() - start)
+
+    batch = [order() for _ in range(args.orders)]
+    start = time.perf_counter()
+    response = client.post(f"/orders/batch?chunk_size={app.BATCH_CHUNK_SIZE}", json=batch)
+    batch_rate = len(batch) / (time.perf_counter() - start)
+
+    with app.app.app_context():
+        added = app.db.session.query(app.Order).count() - orders_before
+    speedup = batch_rate / single_rate
+    print(f"POST /orders/      {single_rate:10,.0f} orders/s (from {len(singles)}, {single_failures} failed)")
+    print(f"POST /orders/batch {batch_rate:10,.0f} orders/s ({response.json['created']} of {len(batch)} created, {speedup:.1f}x)")
+
+    failures = []
+    if single_failures or response.json["created"] != len(batch) or added != len(singles) + len(batch):
+        failures.append(f"Not every order was created: {added} added for {len(singles) + len(batch)} sent.")
+    if speedup < args.target:
+        failures.append(f"The batch route is {speedup:.1f}x the single-order route, short of {args.target:g}x.")
+    if failures:
+        sys.exit("\n".join(failures))
+
+if __name__ == "__main__":
+    main()
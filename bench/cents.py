@@ -0,0 +1,81 @@
+'''Compares the old float money path with integer cents over a large order history: adding up each order's
+lines as float dollars in Python and formatting the total with f"${total:.2f}", against the database's integer
+SUM(price_cents * quantity) formatted with format_cents. Both are timed, and their totals (per order and for
+the whole history) are checked against exact integer arithmetic. The float path is only reported; the cents
+path has to be exact. For example
+
+    python bench/cents.py --orders 10000 --lines 10
+'''
+import argparse
+import sys
+import time
+
+from common import load_app, seed
+
+def float_totals(app, order_ids):
+    # What the endpoints did before: prices held as float dollars, summed per line and formatted per order
+    totals = {}
+    lines = app.db.session.query(app.order_product.c.order_id, app.Product.price_cents, app.order_product.c.quantity).join(
+        app.Product, app.Product.id == app.order_product.c.product_id).filter(app.order_product.c.order_id.in_(order_ids))
+    for order_id, price_cents, quantity in lines:
+        totals[order_id] = totals.get(order_id, 0.0) + (price_cents / 100) * quantity
+    return {order_id: (total, f"${total:.2f}") for order_id, total in totals.items()}
+
+def cents_totals(app, order_ids):
+    return {order_id: (int(total.order_total), app.format_cents(int(total.order_total)))
+            for order_id, total in app.load_order_totals(order_ids).items()}
+
+def exact_totals(app, order_ids):
+    totals = {}
+    lines = app.db.session.query(app.order_product.c.order_id, app.Product.price_cents, app.order_product.c.quantity).join(
+        app.Product, app.Product.id == app.order_product.c.product_id).filter(app.order_product.c.order_id.in_(order_ids))
+    for order_id, price_cents, quantity in lines:
+        totals[order_id] = totals.get(order_id, 0) + price_cents * quantity
+    return totals
+
+def timed(function, app, pages, repeat):
+    '''Runs function over every page of order ids, repeat times, and returns the fastest time and the results.'''
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = {}
+        for page in pages:
+            results.update(function(app, page))
+        times.append(time.perf_counter() - start)
+        app.db.session.expunge_all()
+    return min(times), results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=10000, help="Number of orders in the history.")
+    parser.add_argument("--lines", type=int, default=10, help="Number of lines on each order.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each approach; the fastest is reported.")
+    args = parser.parse_args()
+    app = load_app()
+    seed(app, customers=100, products=max(args.lines, 1000), orders=args.orders, lines=args.lines)
+
+    with app.app.app_context():
+        order_ids = sorted(id for (id,) in app.db.session.query(app.Order.id))
+        # Totals are read a page of orders at a time, as the order endpoints do
+        pages = [order_ids[start:start + app.MAX_PAGE_SIZE] for start in range(0, len(order_ids), app.MAX_PAGE_SIZE)]
+        float_time, floats = timed(float_totals, app, pages, args.repeat)
+        cents_time, cents = timed(cents_totals, app, pages, args.repeat)
+        exact = {}
+        for page in pages:
+            exact.update(exact_totals(app, page))
+
+    inexact = sum(1 for order_id, (total, _) in floats.items() if total * 100 != exact[order_id])
+    misformatted = sum(1 for order_id, (_, text) in floats.items() if text != app.format_cents(exact[order_id]))
+    float_sum = sum(total for total, _ in floats.values())
+    exact_sum = sum(exact.values())
+    wrong = sum(1 for order_id, total in exact.items() if cents.get(order_id) != (total, app.format_cents(total)))
+    print(f"{len(exact)} orders, {args.lines} lines each")
+    print(f"Float dollars: {float_time * 1000:8.1f} ms; {inexact} order total(s) not exact, {misformatted} shown wrong; "
+          f"history total ${float_sum:.2f} (off by {abs(float_sum * 100 - exact_sum):.6f} cents before rounding)")
+    print(f"Integer cents: {cents_time * 1000:8.1f} ms ({float_time / cents_time:.1f}x); {wrong} order total(s) wrong; "
+          f"history total {app.format_cents(sum(total for total, _ in cents.values()))}")
+    if wrong or sum(total for total, _ in cents.values()) != exact_sum:
+        sys.exit("The integer cents totals aren't exact.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+'''Shared setup for the bench scripts: loads the app against a scratch SQLite database (or DATABASE_URL, if set),
+fills it with seed-db and counts the SQL statements a piece of code sends.'''
+from contextlib import contextmanager
+import os
+import sys
+import tempfile
+
+def load_app():
+    '''Imports the app module, pointing it at a new SQLite database unless DATABASE_URL is already set.'''
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import app
+    app.app.config['PASSWORD_ITERATIONS'] = 1000 # Seeding hashes one password; the work factor isn't what is measured
+    return app
+
+def seed(app, customers=0, products=0, orders=0, lines=3):
+    '''Adds generated rows with the seed-db command.'''
+    result = app.app.test_cli_runner().invoke(args=["seed-db", "--customers", str(customers), "--products", str(products),
+                                                    "--orders", str(orders), "--lines", str(lines)])
+    if result.exit_code != 0:
+        raise RuntimeError(result.output) from result.exception
+
+@contextmanager
+def count_queries(app):
+    '''Counts the statements sent to the database inside the block; the count is in the yielded list.'''
+    count = [0]
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        count[0] += 1
+    with app.app.app_context():
+        engine = app.db.engine
+    app.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield count
+    finally:
+        app.event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,87 @@
+'''Checks that concurrent PUT /orders/<id>/add-product requests never lose an update and measures the throughput
+gained over the old read-then-write route: several threads add one of the same product to the same order many
+times over, first through the old route's read, add and UPDATE (served by the bench on a route of its own) and
+then through the upsert. The final quantity has to equal the number of requests that succeeded; the old route
+is expected to lose updates, the upsert must not. For example
+
+    python bench/concurrent_add_product.py --threads 8 --requests 50
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+from common import load_app
+
+def read_then_write_route(app):
+    '''Serves PUT /bench/orders/<id>/add-product the way add_product_to_order did before the upsert.'''
+    def add_product_to_order(order_id):
+        product_id = app.request.args.get('product_id', type=int)
+        quantity = app.request.args.get('quantity', type=int)
+        if app.db.session.get(app.Product, product_id) is None or app.db.session.get(app.Order, order_id) is None:
+            return app.jsonify({"error": "Product or order not found"}), 404
+        entry = app.db.session.query(app.order_product).filter_by(order_id=order_id, product_id=product_id).first()
+        if entry:
+            app.db.session.execute(app.order_product.update().where(
+                (app.order_product.c.order_id == order_id) & (app.order_product.c.product_id == product_id)
+            ).values(quantity=entry.quantity + quantity))
+        else:
+            app.db.session.execute(app.order_product.insert().values(order_id=order_id, product_id=product_id, quantity=quantity))
+        app.db.session.commit()
+        return app.jsonify({"message": "Product successfully added to order!"}), 200
+    app.app.add_url_rule("/bench/orders/<int:order_id>/add-product", "bench_add_product_to_order", add_product_to_order, methods=["PUT"])
+
+def run(app, route, threads, requests):
+    '''Sends the requests for a new order from the threads and returns the successes, failures, final quantity
+    and seconds taken.'''
+    with app.app.app_context():
+        tag = os.urandom(4).hex() # Keeps names unique if DATABASE_URL points at an existing database
+        customer = app.Customer(name="Bench Customer", email=f"bench.{tag}@example.com", phone="555-555-5555")
+        product = app.Product(name=f"Bench Product {tag}", price_cents=100)
+        order = app.Order(date=date.today(), customer=customer)
+        app.db.session.add_all([customer, product, order])
+        app.db.session.commit()
+        order_id, product_id = order.id, product.id
+
+    succeeded = []
+    failures = []
+    def send():
+        client = app.app.test_client()
+        for _ in range(requests):
+            response = client.put(f"{route.format(order_id)}?product_id={product_id}&quantity=1")
+            (succeeded if response.status_code == 200 else failures).append(response.status_code)
+    workers = [threading.Thread(target=send) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    with app.app.app_context():
+        quantity = app.db.session.query(app.order_product.c.quantity).filter(
+            app.order_product.c.order_id == order_id, app.order_product.c.product_id == product_id).scalar() or 0
+    return len(succeeded), len(failures), quantity, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=8, help="Number of threads sending requests at once.")
+    parser.add_argument("--requests", type=int, default=50, help="Number of requests each thread sends.")
+    args = parser.parse_args()
+    app = load_app()
+    read_then_write_route(app)
+
+    results = {}
+    for name, route in [("Read then write", "/bench/orders/{}/add-product"), ("Upsert", "/orders/{}/add-product")]:
+        succeeded, failed, quantity, elapsed = results[name] = run(app, route, args.threads, args.requests)
+        print(f"{name:<15} {succeeded} succeeded, {failed} failed in {elapsed:.2f} s ({succeeded / elapsed:,.0f} requests/s); "
+              f"final quantity {quantity}, {succeeded - quantity} update(s) lost")
+    old, new = results["Read then write"], results["Upsert"]
+    print(f"The upsert handled {(new[0] / new[3]) / (old[0] / old[3]):.1f}x the successful requests per second.")
+    if new[2] != new[0]:
+        sys.exit(f"The upsert lost {new[0] - new[2]} update(s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+'''Measures signup (POST /customers/ with an account) and login (POST /accounts/login) throughput with passwords
+hashed at the configured work factor in PASSWORD_WORKERS worker processes, and reports it per worker. While
+each load runs, GET /products/<id> is timed from another thread and compared with its latency when idle, to
+check the hashing doesn't starve the other endpoints. For example
+
+    python bench/hashing.py --workers 4 --accounts 100
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+
+from common import load_app
+
+def percentile(times, share):
+    return sorted(times)[min(len(times) - 1, int(len(times) * share))]
+
+def probe(client, path, stop, times):
+    # Keeps timing a cheap request until told to stop
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.get(path)
+        times.append(time.perf_counter() - start)
+        time.sleep(0.005)
+
+def run(app, payloads, path, threads, probe_path):
+    '''Posts the payloads to the path from the threads while probing probe_path, and returns the number of
+    successful requests, the seconds taken and the probe's times.'''
+    succeeded = []
+    pending = iter(payloads)
+    lock = threading.Lock()
+    def send():
+        client = app.app.test_client()
+        while True:
+            with lock:
+                payload = next(pending, None)
+            if payload is None:
+                return
+            if client.post(path, json=payload).status_code in (200, 201):
+                succeeded.append(payload)
+    stop = threading.Event()
+    times = []
+    prober = threading.Thread(target=probe, args=(app.app.test_client(), probe_path, stop, times))
+    prober.start()
+    workers = [threading.Thread(target=send) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+    return len(succeeded), elapsed, times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, help="Worker processes for hashing (PASSWORD_WORKERS by default).")
+    parser.add_argument("--iterations", type=int, default=600000, help="PBKDF2 work factor (the app's default PASSWORD_ITERATIONS).")
+    parser.add_argument("--accounts", type=int, default=100, help="Number of signups and of logins.")
+    parser.add_argument("--max-slowdown", type=float, default=5, help="Largest rise in GET /products/<id> p99 under load that passes.")
+    args = parser.parse_args()
+    app = load_app()
+    workers = args.workers or app.app.config['PASSWORD_WORKERS']
+    app.configure_passwords(workers) # Before the first password is hashed, which starts the pool
+    app.app.config['PASSWORD_ITERATIONS'] = iterations = args.iterations # load_app lowers it for seeding
+    threads = workers * 4 # Enough requests at once to keep every worker busy
+
+    client = app.app.test_client()
+    tag = os.urandom(4).hex() # Keeps names unique if DATABASE_URL points at an existing database
+    client.post("/products/", json={"name": f"Bench Product {tag}", "price": 9.99})
+    with app.app.app_context():
+        probe_path = f"/products/{app.db.session.query(app.Product.id).filter_by(name=f'Bench Product {tag}').scalar()}"
+    client.post("/accounts/login", json={"username": "nobody", "password": "Passw0rd!"}) # Start the pool before timing
+
+    idle = []
+    stop = threading.Event()
+    threading.Timer(2, stop.set).start()
+    probe(client, probe_path, stop, idle)
+
+    signups = [{"name": f"Bench Customer {i}", "email": f"bench{i}.{tag}@example.com", "phone": "555-555-5555",
+                "account": {"username": f"bench{i}.{tag}", "password": "Passw0rd!"}} for i in range(args.accounts)]
+    logins = [{"username": f"bench{i}.{tag}", "password": "Passw0rd!"} for i in range(args.accounts)]
+    print(f"{workers} worker(s) on {os.cpu_count()} core(s), {iterations} iterations, {threads} requests at once")
+    print(f"GET {probe_path} idle: p50 {percentile(idle, 0.5) * 1000:.2f} ms, p99 {percentile(idle, 0.99) * 1000:.2f} ms")
+    failures = []
+    for name, path, payloads in [("Signup", "/customers/", signups), ("Login", "/accounts/login", logins)]:
+        succeeded, elapsed, loaded = run(app, payloads, path, threads, probe_path)
+        slowdown = percentile(loaded, 0.99) / percentile(idle, 0.99)
+        print(f"{name:<6} {succeeded} of {len(payloads)} in {elapsed:.1f} s: {succeeded / elapsed:.1f}/s, "
+              f"{succeeded / elapsed / workers:.1f}/s per worker; GET {probe_path} p50 {percentile(loaded, 0.5) * 1000:.2f} ms, "
+              f"p99 {percentile(loaded, 0.99) * 1000:.2f} ms ({slowdown:.1f}x idle)")
+        if succeeded != len(payloads):
+            failures.append(f"{len(payloads) - succeeded} {name.lower()}(s) failed.")
+        if slowdown > args.max_slowdown:
+            failures.append(f"GET {probe_path} p99 rose {slowdown:.1f}x during {name.lower()}s, over {args.max_slowdown:g}x.")
+    if failures:
+        sys.exit("\n".join(failures))
+
+if __name__ == "__main__":
+    main()
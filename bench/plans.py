@@ -0,0 +1,72 @@
+'''Runs the queries behind GET /products/ with price filters and sorts through EXPLAIN against a seeded database,
+and checks that none of them scans the whole Products table, that the ones sorted by price read it through the
+price index, and that pages with a price filter or a cursor search an index rather than walk it from the start
+(only an unfiltered first page may walk one, since it stops at the LIMIT). For example
+
+    python bench/plans.py --products 100000
+'''
+import argparse
+import sys
+
+from common import load_app, seed
+
+ROUTES = [
+    "/products/?min_price=10&max_price=20",
+    "/products/?min_price=10&max_price=20&sort=price",
+    "/products/?sort=price",
+    "/products/?sort=-price",
+    "/products/?max_price=5&sort=-price&limit=50",
+]
+INDEX = "ix_Products_price_cents"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=100000, help="Number of products to seed.")
+    args = parser.parse_args()
+    app = load_app()
+    seed(app, products=args.products)
+    client = app.app.test_client()
+
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+    with app.app.app_context():
+        engine = app.db.engine
+        sqlite = engine.dialect.name == "sqlite"
+    failures = []
+    for route in ROUTES:
+        # Also follow the cursor to the second page, whose query seeks past the first page's last price
+        first = client.get(route).json
+        pages = [route] + ([f"{route}&cursor={first['next_cursor']}"] if first["next_cursor"] else [])
+        for page in pages:
+            statements.clear()
+            app.event.listen(engine, "before_cursor_execute", capture)
+            app.catalog_cache.clear() # Make the request query the database rather than serve a cached page
+            try:
+                client.get(page)
+            finally:
+                app.event.remove(engine, "before_cursor_execute", capture)
+            with app.app.app_context():
+                for statement, parameters in statements:
+                    if "Products" not in statement:
+                        continue
+                    connection = app.db.session.connection()
+                    if sqlite:
+                        plan = [step.detail for step in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+                    else:
+                        plan = [f"{step['table']}: {step['type']} {step['key']}" for step in connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings()]
+                    # None for a full table scan, or the index walked from the start
+                    walked = [index for table, index in app.explain_full_scans(statement, parameters) if table == "Products"]
+                    ok = (None not in walked
+                          and ("sort=" not in page or any(INDEX in step for step in plan))
+                          and ("price=" not in page and "cursor=" not in page or not walked))
+                    print(f"{'ok  ' if ok else 'FAIL'} GET {page}\n       " + "\n       ".join(plan))
+                    if not ok:
+                        failures.append(page)
+    if failures:
+        sys.exit(f"{len(failures)} quer(ies) scan Products, sort by price without {INDEX} or walk an index instead of searching it: "
+                 + ", ".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+'''Checks that the list endpoints send a fixed number of queries however many rows there are: GET /orders and
+GET /customers are called with the largest page as the database grows, and the counts have to stay the same.
+GET /customers also has to load its accounts in at most two queries, which is compared with lazy loading (one
+more query per customer). For example
+
+    python bench/queries.py --sizes 1000 10000 100000
+'''
+import argparse
+import sys
+
+from common import count_queries, load_app, seed
+
+ROUTES = ["/orders", "/customers"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Numbers of orders to measure at.")
+    args = parser.parse_args()
+    app = load_app()
+    limit = app.MAX_PAGE_SIZE
+    client = app.app.test_client()
+
+    counts = {route: [] for route in ROUTES}
+    orders = 0
+    for size in sorted(args.sizes):
+        # One customer and one product for every ten orders, so pages of customers fill up too
+        seed(app, customers=(size - orders) // 10, products=(size - orders) // 10, orders=size - orders)
+        orders = size
+        for route in ROUTES:
+            client.get(f"{route}?limit={limit}") # Warm up, so one-off lookups aren't counted
+            with count_queries(app) as count:
+                response = client.get(f"{route}?limit={limit}")
+            rows = len(response.json["results"])
+            counts[route].append(count[0])
+            print(f"{size:>9} orders  GET {route}?limit={limit}: {rows} rows in {count[0]} queries")
+    # The same page of customers with the account loaded lazily, as it was before the loader policy
+    loaders = app.app.config['CUSTOMER_LOADERS']['get_customers']
+    app.app.config['CUSTOMER_LOADERS']['get_customers'] = {"account": "lazy"}
+    with count_queries(app) as count:
+        client.get(f"/customers?limit={limit}")
+    app.app.config['CUSTOMER_LOADERS']['get_customers'] = loaders
+    print(f"{orders:>9} orders  GET /customers?limit={limit} with lazy accounts: {count[0]} queries")
+
+    failures = [f"GET {route} sent {sorted(set(route_counts))} queries at different sizes"
+                for route, route_counts in counts.items() if len(set(route_counts)) > 1]
+    if max(counts["/customers"]) > 2:
+        failures.append(f"GET /customers sent {max(counts['/customers'])} queries for one page")
+    if failures:
+        sys.exit("\n".join(failures))
+    print("Query counts are flat.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+'''Times repricing every product with one PATCH /products/prices call against doing it one PUT /products/<id> at
+a time (timed on a sample and scaled up), and checks the new prices were stored. For example
+
+    python bench/reprice.py --products 100000 --sample 1000
+'''
+import argparse
+import random
+import sys
+import time
+
+from common import load_app, seed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=100000, help="Number of products repriced.")
+    parser.add_argument("--sample", type=int, default=1000, help="Number of products repriced with PUT to estimate its time.")
+    args = parser.parse_args()
+    app = load_app()
+    seed(app, products=args.products)
+    client = app.app.test_client()
+    with app.app.app_context():
+        products = app.db.session.query(app.Product.id, app.Product.name).all()
+
+    sample = random.sample(products, min(args.sample, len(products)))
+    start = time.perf_counter()
+    for id, name in sample:
+        client.put(f"/products/{id}", json={"name": name, "price": round(random.uniform(1, 500), 2)})
+    put_time = (time.perf_counter() - start) * len(products) / len(sample)
+
+    prices = {str(id): round(random.uniform(1, 500), 2) for id, _ in products}
+    start = time.perf_counter()
+    response = client.patch(f"/products/prices?chunk_size={app.BATCH_CHUNK_SIZE}", json=prices)
+    patch_time = time.perf_counter() - start
+
+    with app.app.app_context():
+        stored = dict(app.db.session.query(app.Product.id, app.Product.price_cents))
+    wrong = sum(1 for id, price in prices.items() if stored[int(id)] != app.to_cents(price))
+    print(f"{len(products)} products: PUT one at a time ~{put_time:.1f} s (from {len(sample)}), "
+          f"PATCH /products/prices {patch_time:.2f} s ({put_time / patch_time:.0f}x), updated {response.json.get('updated')}")
+    if response.status_code != 200 or wrong:
+        sys.exit(f"PATCH returned {response.status_code}; {wrong} price(s) weren't stored.")
+
+if __name__ == "__main__":
+    main()
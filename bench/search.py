@@ -0,0 +1,90 @@
+'''Compares GET /products/by-name, answered from the in-memory name index, with the leading-wildcard ILIKE query
+it replaced (given the same limit), on a catalog of generated product names. Times both over a mix of whole-word,
+substring, two-word and short-word queries, and checks the index finds the same products as ILIKE matching every
+query word, once the documented rules for short words (two letters match the start of a word, one letter a whole
+word) are applied. For example
+
+    python bench/search.py --products 100000 --queries 200
+'''
+import argparse
+import random
+import re
+import string
+import sys
+import time
+
+from common import load_app
+
+def percentile(times, share):
+    return sorted(times)[min(len(times) - 1, int(len(times) * share))]
+
+def matches(app, name, query):
+    # The index's rules, checked against a name ILIKE already found
+    words = re.findall(r"\w+", app.unique_key(name))
+    for token in re.findall(r"\w+", app.unique_key(query)):
+        if len(token) == 1 and token not in words:
+            return False
+        if len(token) == 2 and not any(word.startswith(token) for word in words):
+            return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--products", type=int, default=100000, help="Number of products in the catalog.")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries timed and checked.")
+    parser.add_argument("--limit", type=int, default=100, help="Results asked for by each timed query.")
+    args = parser.parse_args()
+    app = load_app()
+    app.product_indexes_ready.wait() # Let the startup build finish, so it doesn't run alongside the one below
+
+    vocabulary = list({"".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))) for _ in range(2000)})
+    names = [f"{' '.join(random.sample(vocabulary, random.randint(2, 4))).title()} {i}" for i in range(args.products)]
+    with app.app.app_context():
+        for start in range(0, len(names), app.BATCH_CHUNK_SIZE):
+            app.db.session.execute(app.insert(app.Product), [{"name": name, "price_cents": random.randint(100, 50000)}
+                                                             for name in names[start:start + app.BATCH_CHUNK_SIZE]])
+        app.db.session.commit()
+        build_time = app.rebuild_product_indexes()
+    print(f"{args.products} products; name index built in {build_time:.1f} s")
+
+    queries = []
+    for _ in range(args.queries):
+        word = random.choice(vocabulary)
+        kind = random.random()
+        if kind < 0.4:
+            queries.append(word)
+        elif kind < 0.7:
+            start = random.randrange(len(word) - 2)
+            queries.append(word[start:start + random.randint(3, len(word) - start)])
+        elif kind < 0.9:
+            queries.append(f"{word} {random.choice(vocabulary)}")
+        else:
+            queries.append(f"{random.choice(vocabulary)[:2]} {word}")
+
+    client = app.app.test_client()
+    index_times, ilike_times, mismatches = [], [], []
+    with app.app.app_context():
+        for query in queries:
+            start = time.perf_counter()
+            client.get("/products/by-name", query_string={"name": query, "limit": args.limit})
+            index_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            app.Product.query.filter(app.Product.name.ilike(f"%{query}%")).limit(args.limit).all() # The old route's query
+            ilike_times.append(time.perf_counter() - start)
+
+            found = set(app.product_names.search(query, args.products))
+            scanned = app.db.session.query(app.Product.id, app.Product.name).filter(
+                *(app.Product.name.ilike(f"%{word}%") for word in query.split()))
+            expected = {id for id, name in scanned if matches(app, name, query)}
+            if found != expected:
+                mismatches.append(f"{query!r}: index {len(found)}, ILIKE {len(expected)}")
+
+    for name, times in [("Name index", index_times), ("ILIKE", ilike_times)]:
+        print(f"{name:<10} mean {sum(times) / len(times) * 1000:7.2f} ms, p99 {percentile(times, 0.99) * 1000:7.2f} ms")
+    print(f"The index answered {sum(ilike_times) / sum(index_times):.0f}x faster on average; "
+          f"{len(queries) - len(mismatches)} of {len(queries)} queries found the same products.")
+    if mismatches:
+        sys.exit("The index and ILIKE found different products for:\n" + "\n".join(mismatches))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+'''Compares adding up order totals in the database (load_order_totals, as the order endpoints do) with the old
+way of loading every line as Product objects and adding them up in Python, at 10, 100 and 1000 lines per order.
+Both have to give the same totals, item counts and line counts. For example
+
+    python bench/totals.py --orders 100 --lines 10 100 1000
+'''
+import argparse
+import sys
+import time
+
+from common import load_app, seed
+
+def python_totals(app, order_ids):
+    # What the endpoints did before: hydrate each line's Product and sum price * quantity in a loop
+    totals = {}
+    lines = app.db.session.query(app.order_product.c.order_id, app.Product, app.order_product.c.quantity).join(
+        app.Product, app.Product.id == app.order_product.c.product_id).filter(app.order_product.c.order_id.in_(order_ids))
+    for order_id, product, quantity in lines:
+        total = totals.setdefault(order_id, [0, 0, 0])
+        total[0] += product.price_cents * quantity
+        total[1] += quantity
+        total[2] += 1
+    return {order_id: tuple(total) for order_id, total in totals.items()}
+
+def sql_totals(app, order_ids):
+    return {order_id: (int(total.order_total), int(total.item_count), total.line_count)
+            for order_id, total in app.load_order_totals(order_ids).items()}
+
+def best_time(function, repeat, session):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+        session.expunge_all() # Don't let the identity map carry Product objects into the next run
+    return min(times), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=100, help="Number of orders at each size.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 100, 1000], help="Numbers of lines per order to measure at.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each approach; the fastest is reported.")
+    args = parser.parse_args()
+    app = load_app()
+
+    mismatches = 0
+    for lines in args.lines:
+        seed(app, customers=1, products=lines, orders=args.orders, lines=lines)
+        with app.app.app_context():
+            order_ids = [order_id for (order_id,) in app.db.session.query(app.Order.id).order_by(app.Order.id.desc()).limit(args.orders)]
+            python_time, python_result = best_time(lambda: python_totals(app, order_ids), args.repeat, app.db.session)
+            sql_time, sql_result = best_time(lambda: sql_totals(app, order_ids), args.repeat, app.db.session)
+        if python_result != sql_result:
+            mismatches += 1
+        print(f"{lines:>5} lines/order: Python {python_time * 1000:8.1f} ms, SQL {sql_time * 1000:8.1f} ms "
+              f"({python_time / sql_time:.1f}x){'' if python_result == sql_result else '  TOTALS DIFFER'}")
+    if mismatches:
+        sys.exit("The SQL totals don't match the Python ones.")
+
+if __name__ == "__main__":
+    main()
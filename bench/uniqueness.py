@@ -0,0 +1,58 @@
+'''Measures what the uniqueness filters save when checking a batch of mostly new emails, as an import does: the
+batch is checked against the database with and without the email filter ruling out values first. Also checks the
+filter never rules out an email that exists and that its false-positive rate is near the configured one. For example
+
+    python bench/uniqueness.py --customers 100000 --batch 10000
+'''
+import argparse
+import sys
+import time
+import uuid
+
+from common import count_queries, load_app, seed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--customers", type=int, default=100000, help="Number of existing customers.")
+    parser.add_argument("--batch", type=int, default=10000, help="Number of new emails checked.")
+    args = parser.parse_args()
+    app = load_app()
+    seed(app, customers=args.customers)
+
+    with app.app.app_context():
+        # seed-db inserts past the ORM events, so fill the filter the way the app does at startup
+        existing = [email for _, email in app.all_rows(app.Customer.id, app.Customer.email)]
+        app.customer_emails.update(existing)
+        new = [f"new.{uuid.uuid4().hex}@example.com" for _ in range(args.batch)]
+
+        start = time.perf_counter()
+        with count_queries(app) as unfiltered_queries:
+            taken = app.existing_values(app.Customer.email, new)
+        unfiltered_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with count_queries(app) as filtered_queries:
+            candidates = app.possibly_taken(new, app.customer_emails)
+            filtered_taken = app.existing_values(app.Customer.email, candidates)
+        filtered_time = time.perf_counter() - start
+
+        missed = sum(1 for email in existing if email not in app.customer_emails)
+    error_rate = len(candidates) / len(new)
+    configured = app.app.config['UNIQUENESS_FILTER_ERROR_RATE']
+    print(f"{args.customers} existing customers, {args.batch} new emails, filter {app.customer_emails.stats()['size_bytes']} bytes")
+    print(f"Without the filter: {len(new)} emails looked up in {unfiltered_queries[0]} queries, {unfiltered_time * 1000:.1f} ms")
+    print(f"With the filter:    {len(candidates)} emails looked up in {filtered_queries[0]} queries, {filtered_time * 1000:.1f} ms")
+    print(f"False-positive rate {error_rate:.4f} (configured {configured}); existing emails ruled out: {missed}")
+
+    failures = []
+    if missed:
+        failures.append(f"The filter ruled out {missed} existing email(s).")
+    if taken != filtered_taken:
+        failures.append("The filtered check found different taken emails.")
+    if error_rate > 2 * configured:
+        failures.append(f"The false-positive rate {error_rate:.4f} is more than twice the configured {configured}.")
+    if failures:
+        sys.exit("\n".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+'''Times the compiled loaders against marshmallow's schema.load on a valid payload for each schema they serve,
+and checks both give the same result. For example
+
+    python bench/validation.py --number 20000
+'''
+import argparse
+import sys
+import timeit
+
+from common import load_app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=20000, help="Loads timed for each schema and loader.")
+    args = parser.parse_args()
+    app = load_app()
+
+    account = {"username": "jdoe", "password": "Sup3r$ecret"}
+    cases = [
+        ("CustomerAccountSchema", app.account_schema, app.load_account, account),
+        ("CustomerSchema", app.customer_schema, app.load_customer,
+         {"name": "Jane Doe", "email": "jane@example.com", "phone": "555-555-5555", "account": account}),
+        ("OrderSchema", app.order_schema, app.load_order,
+         {"date": "2024-05-01", "customer_id": 1, "products": [{"id": id, "quantity": 2} for id in range(1, 6)]}),
+        ("ProductSchema", app.product_schema, app.load_product, {"name": "Widget", "price": 9.99}),
+    ]
+    mismatches = []
+    for name, schema, load, payload in cases:
+        if load(payload) != schema.load(payload):
+            mismatches.append(name)
+        marshmallow_time = min(timeit.repeat(lambda: schema.load(payload), number=args.number, repeat=3))
+        compiled_time = min(timeit.repeat(lambda: load(payload), number=args.number, repeat=3))
+        print(f"{name:<22} marshmallow {marshmallow_time / args.number * 1e6:7.1f} us, "
+              f"compiled {compiled_time / args.number * 1e6:7.1f} us ({marshmallow_time / compiled_time:.1f}x)")
+    if mismatches:
+        sys.exit(f"The compiled loaders disagree with marshmallow for {', '.join(mismatches)}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+'''A Bloom filter: a fixed-size bit array that answers "definitely not added" or "possibly added" for a value.
+It never forgets a value, so a value that was added and later removed from the database still reads as possibly
+added, which only costs an extra check.'''
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    '''Holds size_bytes of bits and uses enough hash functions to keep false positives near error_rate until
+    capacity values have been added. key, if given, normalizes values before they are hashed.'''
+    def __init__(self, size_bytes, error_rate, key=None):
+        self.size = size_bytes * 8 # Number of bits
+        self.error_rate = error_rate
+        self.hash_count = max(1, round(-math.log2(error_rate)))
+        self.capacity = int(self.size * math.log(2) ** 2 / -math.log(error_rate))
+        self.key = key
+        self.bits = bytearray(size_bytes)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def _positions(self, value):
+        if self.key is not None:
+            value = self.key(value)
+        # Two 64-bit hashes from one digest, combined to give as many bit positions as needed
+        digest = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=16).digest(), "little")
+        first, second = digest & 0xFFFFFFFFFFFFFFFF, (digest >> 64) | 1
+        size = self.size
+        return [(first + i * second) % size for i in range(self.hash_count)]
+
+    def add(self, value):
+        positions = self._positions(value)
+        with self.lock: # Setting a bit reads and rewrites its whole byte
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, values):
+        bits = self.bits
+        with self.lock:
+            for value in values:
+                for position in self._positions(value):
+                    bits[position >> 3] |= 1 << (position & 7)
+                self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def stats(self):
+        # Expected false positive rate for the number of values added so far
+        expected_error_rate = (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+        return {"size_bytes": len(self.bits), "hash_count": self.hash_count, "capacity": self.capacity,
+                "count": self.count, "error_rate": self.error_rate, "expected_error_rate": expected_error_rate}
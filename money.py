@@ -0,0 +1,23 @@
+'''Money arithmetic for prices and totals, which are stored as whole cents in integers so they add up exactly.
+Dollar amounts only appear at the edges: parsed from requests with to_cents and shown with format_cents.'''
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+def to_cents(amount):
+    '''Converts a dollar amount (a Decimal, int, float or numeric string) to whole cents, rounding half a cent
+    up. Raises ValueError for anything that isn't a finite number.'''
+    if isinstance(amount, float):
+        amount = repr(amount) # The shortest decimal that reads back as the float, e.g. 9.99 rather than 9.9900000000000002131628...
+    try:
+        return int((Decimal(amount) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Not a valid amount: {amount!r}")
+
+def to_dollars(cents):
+    '''Returns a number of cents as an exact Decimal dollar amount.'''
+    return Decimal(cents).scaleb(-2)
+
+def format_cents(cents):
+    '''Formats a number of cents as $X.XX using integer arithmetic only.'''
+    if cents < 0:
+        return "-" + format_cents(-cents)
+    return f"${cents // 100}.{cents % 100:02d}"
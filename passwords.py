@@ -0,0 +1,110 @@
+'''Password hashing for customer accounts. Passwords are stored as PBKDF2-SHA256 hashes in the form
+pbkdf2_sha256$<iterations>$<salt>$<hash>. The slow hashing runs in a bounded pool of worker processes
+so it can't take over the request threads. The workers are started fresh by a fork server (or spawned)
+rather than forked from the app, so they hold none of its threads, connections or locks, and they only
+import this module, which only imports the standard library.'''
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.machinery import ModuleSpec
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import sys
+import threading
+
+ALGORITHM = "pbkdf2_sha256"
+
+_pool = None
+_pool_lock = threading.Lock()
+_workers = os.cpu_count() or 1
+_slots = threading.BoundedSemaphore(_workers * 4) # Limits how many hashes can be waiting at once
+
+def configure(workers):
+    '''Sets the number of worker processes. Must be called before the first password is hashed.'''
+    global _workers, _slots
+    _workers = workers
+    _slots = threading.BoundedSemaphore(workers * 4)
+
+def _start_pool():
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload([__name__])
+    pool = ProcessPoolExecutor(max_workers=_workers, mp_context=context)
+    # A new process normally re-runs the main script first, which for python app.py would start the app (and 
+    # ask for the database password) in every worker. Marking __main__ as already set up skips that, and 
+    # starting every worker now means no process is started anywhere else.
+    main = sys.modules["__main__"]
+    spec = main.__spec__
+    if spec is None:
+        main.__spec__ = ModuleSpec("__main__", None)
+    try:
+        for future in [pool.submit(int) for _ in range(_workers)]: # Each submit starts a worker while none is idle
+            future.result()
+    finally:
+        main.__spec__ = spec
+    return pool
+
+def _get_pool():
+    # The pool is created on first use so that it starts after the web server forks its workers
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _start_pool()
+        return _pool
+
+def _with_pool(call):
+    pool = _get_pool()
+    try:
+        return call(pool)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for using too much memory), which breaks the whole pool, so replace it 
+        # and try once more
+        global _pool
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        return call(_get_pool())
+
+def _run(function, *args):
+    with _slots: # Wait for a free slot instead of queueing without limit
+        return _with_pool(lambda pool: pool.submit(function, *args).result())
+
+def _encode(data):
+    return base64.b64encode(data).decode()
+
+def make_hash(password, iterations):
+    '''Hashes the password with a new random salt. Runs in a worker process.'''
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{ALGORITHM}${iterations}${_encode(salt)}${_encode(digest)}"
+
+def check_hash(password, stored):
+    '''Checks the password against a stored hash. Runs in a worker process. Accounts created before
+    hashing was added still hold the plain password, which is compared directly.'''
+    if not stored.startswith(ALGORITHM + "$"):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, iterations, salt, digest = stored.split("$")
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(salt), int(iterations))
+    return hmac.compare_digest(_encode(candidate), digest)
+
+def needs_rehash(stored, iterations):
+    '''Returns True if the stored value is a plain password or was hashed with a different work factor.'''
+    return not stored.startswith(f"{ALGORITHM}${iterations}$")
+
+def hash_password(password, iterations):
+    '''Hashes the password in the worker pool.'''
+    return _run(make_hash, password, iterations)
+
+def hash_passwords(passwords, iterations):
+    '''Hashes a list of passwords across all the workers in the pool, returning the hashes in the same order.'''
+    chunksize = max(1, len(passwords) // (_workers * 4))
+    with _slots:
+        return _with_pool(lambda pool: list(pool.map(make_hash, passwords, [iterations] * len(passwords), chunksize=chunksize)))
+
+def verify_password(password, stored):
+    '''Checks the password against the stored hash in the worker pool.'''
+    return _run(check_hash, password, stored)
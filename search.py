@@ -0,0 +1,244 @@
+'''In-memory indexes for finding names without scanning every row. NameIndex maps each word of a name, and each
+trigram (three character run) of its words, to a sorted array of the ids of the names containing it, so a search
+only looks at ids that can match and stops as soon as it has enough. PrefixIndex keeps the names in sorted order
+so the ones starting with a prefix are found with a binary search.'''
+from array import array
+from bisect import bisect_left, bisect_right, insort
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def trigrams(words):
+    # A leading space gives every word a trigram for its first two characters, used to match short words
+    return {word[i:i + 3] for word in (f" {word}" for word in words) for i in range(len(word) - 2)}
+
+def insert(postings, key, id):
+    ids = postings.get(key)
+    if ids is None:
+        postings[key] = array("i", (id,))
+    elif ids[-1] < id: # New ids are usually the largest, so this is normally an append
+        ids.append(id)
+    else:
+        insort(ids, id)
+
+def discard(postings, key, id):
+    ids = postings[key]
+    del ids[bisect_left(ids, id)]
+    if not ids:
+        del postings[key]
+
+def contains(ids, id):
+    position = bisect_left(ids, id)
+    return position < len(ids) and ids[position] == id
+
+class NameIndex:
+    '''Maps ids to names and answers word searches. Query words of three or more characters match anywhere in a
+    name's words, two-character words match the start of a word and single characters match whole words. Results
+    come best first: the name matching the query exactly, then names containing every query word as a whole word, 
+    then other matches, with lower ids first within each group. key, if given, normalizes names and queries 
+    before they are compared.'''
+    def __init__(self, key=None):
+        self.key = key
+        self.names = {} # id -> normalized name, as a string of words separated and surrounded by spaces
+        self.ids = {} # normalized name -> id
+        self.words = {} # word -> array of ids, in order
+        self.trigrams = {} # trigram -> array of ids, in order
+        self.pending = None # (id, name or None) changes made while a rebuild is reading rows
+        self.lock = threading.Lock()
+
+    def _tokens(self, text):
+        return TOKEN_PATTERN.findall(self.key(text) if self.key is not None else text)
+
+    def _add(self, id, tokens):
+        name = f" {' '.join(tokens)} "
+        self.names[id] = name
+        self.ids[name] = id
+        for word in set(tokens):
+            insert(self.words, word, id)
+        for trigram in trigrams(tokens):
+            insert(self.trigrams, trigram, id)
+
+    def _remove(self, id):
+        name = self.names.pop(id, None)
+        if name is None:
+            return
+        if self.ids.get(name) == id:
+            del self.ids[name]
+        tokens = name.split()
+        for word in set(tokens):
+            discard(self.words, word, id)
+        for trigram in trigrams(tokens):
+            discard(self.trigrams, trigram, id)
+
+    def add(self, id, name):
+        '''Adds a name, replacing the one already stored for the id.'''
+        tokens = self._tokens(name)
+        with self.lock:
+            self._remove(id)
+            self._add(id, tokens)
+            if self.pending is not None:
+                self.pending.append((id, name))
+
+    def update(self, rows):
+        '''Adds (id, name) pairs, replacing names already stored for their ids.'''
+        with self.lock:
+            for id, name in rows:
+                if id in self.names:
+                    self._remove(id)
+                self._add(id, self._tokens(name))
+
+    def remove(self, id):
+        with self.lock:
+            self._remove(id)
+            if self.pending is not None:
+                self.pending.append((id, None))
+
+    def rebuild(self, rows):
+        '''Replaces every name with the (id, name) pairs given. The new index is built while searches carry on 
+        against the old one, and changes made in the meantime are applied to it before it is swapped in.'''
+        with self.lock:
+            self.pending = []
+        try:
+            fresh = NameIndex(self.key)
+            fresh.update(rows)
+        except BaseException:
+            with self.lock:
+                self.pending = None
+            raise
+        with self.lock:
+            for id, name in self.pending:
+                fresh._remove(id)
+                if name is not None:
+                    fresh._add(id, fresh._tokens(name))
+            self.names, self.ids, self.words, self.trigrams = fresh.names, fresh.ids, fresh.words, fresh.trigrams
+            self.pending = None
+
+    def _candidates(self, token):
+        # Ids whose names might contain the token: those with its rarest trigram, or for a short token, those with
+        # a word starting with it or equal to it
+        if len(token) >= 3:
+            return min((self.trigrams.get(token[i:i + 3], ()) for i in range(len(token) - 2)), key=len)
+        if len(token) == 2:
+            return self.trigrams.get(f" {token}", ())
+        return self.words.get(token, ())
+
+    def search(self, query, limit):
+        '''Returns the ids of up to limit names containing every word of the query, best matches first.'''
+        tokens = list(dict.fromkeys(self._tokens(query)))
+        if not tokens:
+            return []
+        # What each token has to be found as in a name's string of words
+        patterns = [token if len(token) >= 3 else f" {token}" if len(token) == 2 else f" {token} " for token in tokens]
+        with self.lock:
+            results = []
+            exact = self.ids.get(f" {' '.join(tokens)} ")
+            if exact is not None:
+                results.append(exact)
+            # Names containing every token as a whole word, walking the rarest word's ids in order
+            word_ids = sorted((self.words.get(token, ()) for token in tokens), key=len)
+            whole_words = set()
+            for id in word_ids[0]:
+                if len(results) >= limit:
+                    break
+                if id != exact and all(contains(ids, id) for ids in word_ids[1:]):
+                    results.append(id)
+                    whole_words.add(id)
+            # Any other names containing every token, walking the ids of the rarest trigram in order
+            if len(results) < limit:
+                for id in min((self._candidates(token) for token in tokens), key=len):
+                    if id != exact and id not in whole_words and all(pattern in self.names[id] for pattern in patterns):
+                        results.append(id)
+                        if len(results) >= limit:
+                            break
+        return results
+
+class PrefixIndex:
+    '''Keeps names sorted by their normalized form, so the names starting with a prefix sit next to each other
+    and are found with a binary search. key, if given, normalizes names and prefixes before they are compared.'''
+    def __init__(self, key=None):
+        self.key = key
+        self.keys = [] # normalized names, in order
+        self.ids = array("i") # the id of each name in keys
+        self.names = {} # id -> (normalized name, name)
+        self.pending = None # (id, name or None) changes made while a rebuild is reading rows
+        self.lock = threading.Lock()
+
+    def _normalize(self, text):
+        return self.key(text) if self.key is not None else text
+
+    def _remove(self, id):
+        entry = self.names.pop(id, None)
+        if entry is None:
+            return
+        position = bisect_left(self.keys, entry[0])
+        while self.ids[position] != id: # Step past other names with the same normalized form
+            position += 1
+        del self.keys[position]
+        del self.ids[position]
+
+    def _add(self, id, key, name):
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.ids.insert(position, id)
+        self.names[id] = (key, name)
+
+    def add(self, id, name):
+        '''Adds a name, replacing the one already stored for the id.'''
+        key = self._normalize(name)
+        with self.lock:
+            self._remove(id)
+            self._add(id, key, name)
+            if self.pending is not None:
+                self.pending.append((id, name))
+
+    def update(self, rows):
+        '''Adds (id, name) pairs, replacing names already stored for their ids, and sorts everything once
+        instead of inserting names one at a time.'''
+        with self.lock:
+            for id, name in rows:
+                self.names[id] = (self._normalize(name), name)
+            entries = sorted((key, id) for id, (key, _) in self.names.items())
+            self.keys = [key for key, _ in entries]
+            self.ids = array("i", (id for _, id in entries))
+
+    def remove(self, id):
+        with self.lock:
+            self._remove(id)
+            if self.pending is not None:
+                self.pending.append((id, None))
+
+    def rebuild(self, rows):
+        '''Replaces every name with the (id, name) pairs given, building the new order while searches carry on 
+        against the old one and applying changes made in the meantime before swapping it in.'''
+        with self.lock:
+            self.pending = []
+        try:
+            fresh = PrefixIndex(self.key)
+            fresh.update(rows)
+        except BaseException:
+            with self.lock:
+                self.pending = None
+            raise
+        with self.lock:
+            for id, name in self.pending:
+                fresh._remove(id)
+                if name is not None:
+                    fresh._add(id, fresh._normalize(name), name)
+            self.keys, self.ids, self.names = fresh.keys, fresh.ids, fresh.names
+            self.pending = None
+
+    def search(self, prefix, limit):
+        '''Returns (id, name) for up to limit names starting with the prefix, in order.'''
+        prefix = self._normalize(prefix)
+        if not prefix:
+            return []
+        results = []
+        with self.lock:
+            start = bisect_left(self.keys, prefix)
+            for position in range(start, min(start + limit, len(self.keys))):
+                if not self.keys[position].startswith(prefix):
+                    break
+                id = self.ids[position]
+                results.append((id, self.names[id][1]))
+        return results